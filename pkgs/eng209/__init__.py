@@ -19,19 +19,74 @@ def __find_project_root(*markers: str | Sequence[str]) -> Path:
         else:
             _markers = markers
 
-        for file in [__file__, sysconfig.get_paths().get("purelib", "")]:
-            path = Path(file).resolve()
+        # Folders searched for a marker, nearest parents first
+        origin = os.path.realpath(__file__)
+        folders = []
+        for file in [origin, sysconfig.get_paths().get("purelib", "")]:
+            path = os.path.realpath(file)
             for depth in range(0, 10):
-                path = path.parent
-                for marker in _markers:
-                    if (path / marker).exists():
-                        return path
+                path = os.path.dirname(path)
+                folders.append(path)
+
+        # Result of the last search from this same package file (root, or empty
+        # when no marker was found), trusted as long as none of the folders it
+        # went through was modified since: adding or removing a marker changes
+        # the mtime of its folder.
+        cached = __read_cached_project_root(origin)
+        if cached is not None:
+            cached_root, signature = cached
+            searched = folders[: signature.count(",") + 1]
+            if signature == __folders_signature(searched):
+                return Path(cached_root) if cached_root else Path.home()
+
+        for i, path in enumerate(folders):
+            for marker in _markers:
+                if os.path.exists(os.path.join(path, marker)):
+                    __write_cached_project_root(
+                        origin, path, __folders_signature(folders[: i + 1])
+                    )
+                    return Path(path)
+
+        __write_cached_project_root(origin, "", __folders_signature(folders))
     except:
         pass
 
     return Path.home()
 
 
+__project_root_cache = os.path.join(
+    os.path.expanduser("~"), ".cache", "eng209", "project_root"
+)
+
+
+def __folders_signature(folders: list[str]) -> str:
+    return ",".join(str(os.stat(folder).st_mtime_ns) for folder in folders)
+
+
+def __read_cached_project_root(origin: str) -> tuple[str, str] | None:
+    """
+    Returns the cached (root, signature) if it was searched from the same origin,
+    the root is empty when no marker was found.
+    """
+    try:
+        with open(__project_root_cache, "r") as f:
+            cached_origin, cached_root, cached_signature = f.read().split("\n")[:3]
+        if cached_origin == origin:
+            return cached_root, cached_signature
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def __write_cached_project_root(origin: str, root: str, signature: str):
+    try:
+        os.makedirs(os.path.dirname(__project_root_cache), exist_ok=True)
+        with open(__project_root_cache, "w") as f:
+            f.write(f"{origin}\n{root}\n{signature}\n")
+    except OSError:
+        pass
+
+
 _marker = ".qdb"
 
 __project_root: Path = __find_project_root(_marker, '.git', '.vscode')
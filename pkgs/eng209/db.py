@@ -1,6 +1,9 @@
+import atexit
 import getpass
 import sqlite3
+import threading
 import uuid
+from collections.abc import Iterable
 from pathlib import Path
 from enum import Enum
 
@@ -8,84 +11,177 @@ from . import get_project_root, _marker
 from .models import *
 
 
-def __initialize():
-    (get_project_root() / _marker).mkdir(parents=False, exist_ok=True)
-    with sqlite3.connect(get_project_root() / _marker / "sys.db") as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS quiz_scoring(
-                pid INTEGER PRIMARY KEY,
-                uuid VARCHAR(36) NOT NULL,
-                label TEXT,
-                score REAL NOT NULL,
-                source_url TEXT,
-                source_label TEXT,
-                source_uuid TEXT NOT NULL,
-                group_id INTEGER,
-                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
-            )"""
-        )
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS quiz_sys(
-                uuid VARCHAR(36) NOT NULL,
-                alias TEXT UNIQUE,
-                synched_at TIMESTAMP,
-                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
-            )"""
-        )
-        cursor.executemany(
-            """
-            INSERT OR IGNORE INTO quiz_sys(uuid, alias)
-            VALUES(?,?)
-            """,
-            [(str(uuid.uuid4()), getpass.getuser())],
-        )
+_INSERT_SCORE_SQL = """
+    INSERT INTO quiz_scoring(
+        uuid,
+        score,
+        label,
+        source_url,
+        source_label,
+        source_uuid,
+        group_id
+    )
+    VALUES(?,?,?,?,?,?,?)
+    """
+
+
+def __initialize(root: Path) -> sqlite3.Connection:
+    (root / _marker).mkdir(parents=False, exist_ok=True)
+    # Shared connection in autocommit mode, access is serialized by _lock.
+    conn = sqlite3.connect(
+        root / _marker / "sys.db", check_same_thread=False, isolation_level=None
+    )
+    # WAL: appends are sequential and readers do not block behind writers.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS quiz_scoring(
+            pid INTEGER PRIMARY KEY,
+            uuid VARCHAR(36) NOT NULL,
+            label TEXT,
+            score REAL NOT NULL,
+            source_url TEXT,
+            source_label TEXT,
+            source_uuid TEXT NOT NULL,
+            group_id INTEGER,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )"""
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS quiz_sys(
+            uuid VARCHAR(36) NOT NULL,
+            alias TEXT UNIQUE,
+            synched_at TIMESTAMP,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )"""
+    )
+    cursor.executemany(
+        """
+        INSERT OR IGNORE INTO quiz_sys(uuid, alias)
+        VALUES(?,?)
+        """,
+        [(str(uuid.uuid4()), getpass.getuser())],
+    )
+    # uuid filters are case-insensitive, like LIKE
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_score_uuid_nocase_created
+        ON quiz_scoring(uuid COLLATE NOCASE, created_at)
+        """
+    )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_score_created
+        ON quiz_scoring(created_at DESC)
+        """
+    )
+    return conn
+
+
+_lock = threading.Lock()
+_conn: sqlite3.Connection | None = None
+_conn_root: Path | None = None
+
+
+def _connection() -> sqlite3.Connection:
+    """
+    Returns the connection to the database of the current project root, it is
+    reopened when the root was changed by set_project_root (hold _lock).
+    """
+    global _conn, _conn_root
+    root = get_project_root()
+    if _conn is None or root is not _conn_root:
+        if _conn is not None:
+            _conn.close()
+        _conn = __initialize(root)
+        _conn_root = root
+    return _conn
 
 
-__initialize()
+def __close():
+    with _lock:
+        if _conn is not None:
+            _conn.close()
+
+
+with _lock:
+    _connection()
+atexit.register(__close)
 
 
 def insert_score(
     quiz: Quiz,
     score: float,
 ):
-    with sqlite3.connect(get_project_root() / _marker / "sys.db") as conn:
-        cursor = conn.cursor()
-        cursor.executemany(
-            """
-            INSERT INTO quiz_scoring(
-                uuid,
+    with _lock:
+        _connection().execute(
+            _INSERT_SCORE_SQL,
+            (
+                quiz.uuid,
                 score,
-                label,
-                source_url,
-                source_label,
-                source_uuid,
-                group_id
-            )
-            VALUES(?,?,?,?,?,?,?)
-            """,
-            [
-                (
-                    quiz.uuid,
-                    score,
-                    quiz.label,
-                    quiz.context.source,
-                    quiz.context.label,
-                    quiz.context.uuid,
-                    quiz.context.group,
-                )
-            ],
+                quiz.label,
+                quiz.context.source,
+                quiz.context.label,
+                quiz.context.uuid,
+                quiz.context.group,
+            ),
         )
 
 
+def insert_scores_bulk(rows: Iterable[tuple]):
+    """
+    Inserts many scores in a single transaction.
+
+    Each row holds (uuid, score, label, source_url, source_label, source_uuid, group_id).
+    """
+    with _lock:
+        conn = _connection()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(_INSERT_SCORE_SQL, rows)
+        except:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
 class FetchMode(Enum):
     OLDEST = 1
     NEWEST = 2
     ALL = 3
 
 
+_FETCH_SCORE_FIRST_SQL = """
+    WITH t1 AS (
+            SELECT uuid,{op}(created_at) AS min_created_at
+            FROM quiz_scoring
+            WHERE {where}
+            GROUP BY uuid
+    )
+    SELECT t2.*
+    FROM quiz_scoring t2
+    INNER JOIN t1
+    ON t1.uuid == t2.uuid
+    AND t2.created_at = t1.min_created_at
+    ORDER BY created_at DESC
+    LIMIT ?
+    """
+
+_FETCH_SCORE_SQL: dict[FetchMode, str] = {
+    FetchMode.ALL: """
+        SELECT * FROM quiz_scoring
+        WHERE {where}
+        ORDER BY created_at DESC
+        LIMIT ?
+        """,
+    FetchMode.OLDEST: _FETCH_SCORE_FIRST_SQL.format(op="MIN", where="{where}"),
+    FetchMode.NEWEST: _FETCH_SCORE_FIRST_SQL.format(op="MAX", where="{where}"),
+}
+
+
 def fetch_score(
     after: str = "0001-01-01",
     before: str = "9999-12-31",
@@ -94,64 +190,29 @@ def fetch_score(
     limit: int = 100,
     mode: FetchMode = FetchMode.ALL,
 ) -> list[dict]:
-    with sqlite3.connect(get_project_root() / _marker / "sys.db") as conn:
-        conn.row_factory = sqlite3.Row
-        result: list[dict] = []
-        cursor = conn.cursor()
-
-        if mode == FetchMode.ALL:
-            cursor.execute(
-                """
-                SELECT * FROM quiz_scoring
-                WHERE created_at > ?
-                AND created_at < ?
-                AND uuid LIKE ?
-                AND source_uuid LIKE ?
-                ORDER BY created_at DESC
-                LIMIT ?
-                """,
-                (
-                    after,
-                    before,
-                    uuid,
-                    source_uuid,
-                    limit,
-                ),
-            )
+    where = ["created_at > ?", "created_at < ?"]
+    params: list[str | int] = [after, before]
+    # Only filter on columns the caller restricted, with '=' unless a pattern is
+    # given, so that SQLite can use the uuid index instead of a full scan.
+    # NOCASE keeps the ASCII case-insensitive matching of LIKE.
+    for column, value in (("uuid", uuid), ("source_uuid", source_uuid)):
+        if value == "%":
+            continue
+        elif "%" in value or "_" in value:
+            where.append(f"{column} LIKE ?")
         else:
-            if mode == FetchMode.OLDEST:
-                op = "MIN"
-            else:
-                op = "MAX"
-            cursor.execute(
-                f"""
-                WITH t1 AS (
-                        SELECT uuid,{op}(created_at) AS min_created_at
-                        FROM quiz_scoring 
-                        WHERE created_at > ?
-                        AND created_at < ?
-                        AND uuid LIKE ?
-                        AND source_uuid LIKE ?
-                        GROUP BY uuid
-                )
-                SELECT t2.*
-                FROM quiz_scoring t2 
-                INNER JOIN t1
-                ON t1.uuid == t2.uuid
-                AND t2.created_at = t1.min_created_at
-                ORDER BY created_at DESC
-                LIMIT ?
-                """,
-                (
-                    after,
-                    before,
-                    uuid,
-                    source_uuid,
-                    limit,
-                ),
-            )
-        for row in cursor:
-            result.append(dict(row))
+            where.append(f"{column} = ? COLLATE NOCASE")
+        params.append(value)
+    params.append(limit)
+
+    with _lock:
+        cursor = _connection().cursor()
+        cursor.execute(
+            _FETCH_SCORE_SQL[mode].format(where=" AND ".join(where)),
+            params,
+        )
+        columns = [c[0] for c in cursor.description]
+        result: list[dict] = [dict(zip(columns, row)) for row in cursor.fetchall()]
 
     return result
 
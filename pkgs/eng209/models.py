@@ -45,13 +45,15 @@ class Quiz:
         self.__container: widgets.Box | None = Container(
             json.get("container")
         ) or defaults.get("container")
+        self.__options_is_list: bool = isinstance(self.__options, list)
+        self.__options_is_dict: bool = isinstance(self.__options, dict)
 
         if not self.__question or not self.__options:
             self.__type: QuizType = QuizType.INVALID
-        elif isinstance(self.__options, dict):
+        elif self.__options_is_dict:
             self.__type = QuizType.MULTI_CHOICE
         elif (
-            isinstance(self.__options, list)
+            self.__options_is_list
             and self.__answer >= 0
             and self.__answer < len(self.__options)
         ):
@@ -59,6 +61,15 @@ class Quiz:
         else:
             self.__type = QuizType.INVALID
 
+        if self.__options_is_list:
+            self.__option_map: dict[str, bool] = {
+                option: (i == self.__answer) for i, option in enumerate(self.__options)
+            }
+        elif self.__options_is_dict:
+            self.__option_map = self.__options
+        else:
+            self.__option_map = {}
+
     @property
     def context(self) -> Context:
         return self.__context
@@ -77,25 +88,14 @@ class Quiz:
 
     @property
     def option_list(self) -> list[str]:
-        if isinstance(self.__options, list):
+        if self.__options_is_list:
             return self.__options
         else:
             return []
 
     @property
     def option_map(self) -> dict[str, bool]:
-        if isinstance(self.__options, list):
-            return {
-                k: v
-                for k, v in zip(
-                    self.__options,
-                    [i == self.__answer for i in range(0, len(self.__options))],
-                )
-            }
-        elif isinstance(self.__options, dict):
-            return self.__options
-        else:
-            return {}
+        return self.__option_map
 
     @property
     def uuid(self) -> str | None:
@@ -11,6 +11,22 @@ from .models import *
 from . import get_project_root, _marker
 from . import db
 
+try:
+    # Faster parser if installed, its errors subclass json.JSONDecodeError.
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    # Keep-alive session reused across quiz loads (gzip is negotiated by default).
+    import requests
+
+    _session: "requests.Session | None" = requests.Session()
+except ImportError:
+    _session = None
+
 
 def create_quiz_pickone(quiz: Quiz):
     """
@@ -24,13 +40,14 @@ def create_quiz_pickone(quiz: Quiz):
 
     button = widgets.Button(description="Valider", button_style="success")
     output = widgets.Output()
+    correct_answer = quiz.option_list[quiz.answer]
 
     def check(b):
         with output:
             output.clear_output()
             if radio.value is None:
                 print("⚠️ Choisissez une option SVP.")
-            elif radio.value == quiz.option_list[quiz.answer]:
+            elif radio.value == correct_answer:
                 score = 1.0
                 print("✅ Correct!")
             else:
@@ -90,14 +107,16 @@ def create_quiz_select_all_that_apply(quiz: Quiz):
     def check(b):
         with output:
             output.clear_output()
-            selected = {checkbox.description: checkbox.value for checkbox in checkboxes}
-            if selected == quiz.option_map:
+            expected = quiz.option_map
+            correct = 0
+            for checkbox in checkboxes:
+                if checkbox.value == expected[checkbox.description]:
+                    correct += 1
+            if correct == len(checkboxes):
                 print("✅ Correct!")
             else:
                 print("❌ Réessaie!")
-            c = [selected[k] == quiz.option_map[k] for k in selected.keys()]
-            count_true = sum(c)
-            score = float(sum(c)) / float(len(c))
+            score = float(correct) / float(len(checkboxes))
             db.insert_score(quiz, score)
 
     button._click_handlers.callbacks.clear()
@@ -148,13 +167,18 @@ def show(
 
         url_parts = urlparse(_quiz_url)
 
-        if url_parts.scheme in ["file", "http", "https"]:
+        if url_parts.scheme in ["http", "https"] and _session is not None:
+            response = _session.get(_quiz_url, timeout=5.0)
+            response.raise_for_status()
+            json_obj = _json_loads(response.content)
+
+        elif url_parts.scheme in ["file", "http", "https"]:
             with urllib.request.urlopen(_quiz_url, timeout=5.0) as url:
-                json_obj = json.load(url)
+                json_obj = _json_loads(url.read())
 
         else:
-            with open(_quiz_url, "r") as file_fd:
-                json_obj = json.load(file_fd)
+            with open(_quiz_url, "rb") as file_fd:
+                json_obj = _json_loads(file_fd.read())
 
         configuration = {
             "container": (
@@ -172,14 +196,14 @@ def show(
 
         clear_output(wait=True)
         for quiz_json in json_obj.get("quizzes", []):
+            if context.group:
+                if context.group not in quiz_json.get("groups", []):
+                    continue
+
             quiz_obj = Quiz(quiz_json, context, configuration)
             if quiz_obj.type == QuizType.INVALID:
                 continue
 
-            if context.group:
-                if context.group not in quiz_obj.groups:
-                    continue
-
             if quiz_obj.type == QuizType.SINGLE_CHOICE:
                 create_quiz_pickone(quiz_obj)
 
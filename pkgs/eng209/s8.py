@@ -10,24 +10,24 @@ from sklearn.base import BaseEstimator
 def viz3D(model: Pipeline, *data: pd.DataFrame) -> None:
     salinity: NDArray[np.float64] = np.linspace(0, 40, 100)
     temperature: NDArray[np.float64] = np.linspace(18, 34, 100)
-    depth: NDArray[np.float64] = np.asarray(pd.concat([df.depth for df in data])).mean()
-
-    surf_X = np.transpose(
-        [
-            np.tile(salinity, len(temperature)),
-            np.repeat(temperature, len(salinity)),
-            np.full(len(temperature) * len(salinity), depth),
-        ]
+    depth: float = sum(df.depth.to_numpy().sum() for df in data) / sum(
+        len(df) for df in data
     )
 
+    S, T = np.meshgrid(salinity, temperature)
+    surf_X: NDArray[np.float64] = np.empty((S.size, 3), dtype=np.float64)
+    surf_X[:, 0] = S.ravel()
+    surf_X[:, 1] = T.ravel()
+    surf_X[:, 2] = depth
+
     surf_y = np.asarray(model.predict(surf_X))
 
     fig = go.Figure(
         data=[
             go.Scatter3d(
-                z=df.velocity,
-                x=df.salinity.values,
-                y=df.temperature.values,
+                z=df.velocity.to_numpy(),
+                x=df.salinity.to_numpy(),
+                y=df.temperature.to_numpy(),
                 mode="markers",
                 marker_size=4,
             )
@@ -6,6 +6,7 @@ import requests
 import shutil
 import sys
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from packaging.version import Version, InvalidVersion
 from pathlib import Path
 
@@ -13,26 +14,44 @@ from pathlib import Path
 
 cache_dir: Path = Path.home() / ".cache" / "eng209" / "pooch"
 
+_TAG_RE: re.Pattern = re.compile(r"^(v\d+(?:\.\d+){0,2})(?:-(.+))?$")
 
-def get_release_assets(repo: str, per_page: int = 100) -> list[dict]:
-    """Fetch all releases from a GitHub repo, with pagination."""
-    releases = []
-    page = 1
-    while True:
-        url = f"https://api.github.com/repos/{repo}/releases"
-        params = {"page": page, "per_page": per_page}
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        batch = response.json()
-        if not batch:
-            break
-        releases.extend(batch)
-        page += 1
-    return releases
+
+def get_release_assets(
+    repo: str, per_page: int = 100, max_workers: int = 8
+) -> list[dict]:
+    """Fetch all releases from a GitHub repo, with pagination.
+
+    The first page is fetched alone, further pages are requested
+    `max_workers` at a time until an empty or partial page is returned.
+    """
+    url = f"https://api.github.com/repos/{repo}/releases"
+
+    with requests.Session() as session:
+
+        def get_page(page: int) -> list[dict]:
+            params = {"page": page, "per_page": per_page}
+            response = session.get(url, params=params)
+            response.raise_for_status()
+            return response.json()
+
+        releases = get_page(1)
+        if len(releases) < per_page:
+            return releases
+
+        page = 2
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                pages = range(page, page + max_workers)
+                for batch in executor.map(get_page, pages):
+                    releases.extend(batch)
+                    if len(batch) < per_page:
+                        return releases
+                page += max_workers
 
 
 def parse_tag(tag: str) -> tuple[(str | None, ...)]:
-    match = re.match(r"^(v\d+(?:\.\d+){0,2})(?:-(.+))?$", tag)
+    match = _TAG_RE.match(tag)
     if match:
         return match.groups()
     return None, None
@@ -43,23 +62,23 @@ def select_latest_matching_release(
     version_prefix: str | None = None,
     label_regex: str | None = None,
 ) -> dict | None:
-    matches = []
+    label_re = re.compile(label_regex) if label_regex else None
+    best: tuple[Version, dict] | None = None
     for release in releases:
         version_tag, label = parse_tag(release["tag_name"])
         if not version_tag:
             continue
         if version_prefix and not version_tag.startswith(version_prefix):
             continue
-        if label_regex and (label is None or not re.match(label_regex, label)):
+        if label_re and (label is None or not label_re.match(label)):
             continue
         try:
             version_obj = Version(version_tag[1:])  # remove leading 'v'
         except InvalidVersion:
             continue
-        matches.append((version_obj, release))
-    if not matches:
-        return None
-    return max(matches, key=lambda x: x[0])[1]
+        if best is None or version_obj > best[0]:
+            best = (version_obj, release)
+    return best[1] if best else None
 
 
 def fetch_asset_with_pooch(
@@ -18,18 +18,22 @@
 ## ----------------------------------------------------------------------
 
 import argparse
-import glob
 import hashlib
 import json
 import logging
 import os
 import shutil
+import stat
 import subprocess
 import sys
+import threading
 import time
 import urllib.request
 import venv
 import zipfile
+from collections.abc import Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import date
 from http.client import HTTPSConnection
 from urllib.parse import urlparse, urljoin
@@ -80,10 +84,40 @@ VSCODE_EXTENSIONS: dict = {
     ],
     "uninstall": ["formulahendry.code-runner"],
 }
+# Hidden in explorer, ignored by the file watcher and excluded from search
+VSCODE_EXCLUDES: dict[str, bool] = {
+    "**/.env": True,
+    "**/.git": True,
+    "**/.DS_Store": True,
+    "**/venv": True,
+    "**/.mypy_cache": True,
+    "**/.ipynb_checkpoints": True,
+    "**/.__pycache__": True,
+    "**/*.pyc": True,
+}
 # === ===
 
 logger: logging.Logger
 
+# Shared sink for silenced subprocess output
+DEVNULL_FD: int = os.open(os.devnull, os.O_WRONLY)
+
+# Raw binary writes of extracted files (O_BINARY only exists on Windows)
+WRITE_FLAGS: int = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+try:
+    # Keep-alive HTTP/2 client when httpx (and h2) are available, else urllib
+    import httpx
+
+    HTTP_CLIENT: "httpx.Client | None" = httpx.Client(
+        http2=True,
+        headers={"User-Agent": "Client"},
+        timeout=30,
+        follow_redirects=True,
+    )
+except ImportError:
+    HTTP_CLIENT = None
+
 
 class LogFormatter(logging.Formatter):
     SYMBOLS = {
@@ -107,22 +141,32 @@ class LogFormatter(logging.Formatter):
     def __init__(self, use_color: bool = True):
         super().__init__()
         self.use_color = use_color and sys.stdout.isatty()
+        # Level labels are formatted once, not for every record
+        if self.use_color:
+            self._labels = {
+                level: self.COLORS[level] + symbol + self.RESET
+                for level, symbol in self.SYMBOLS.items()
+            }
+            self._default_label = "?" + self.RESET
+        else:
+            self._labels = dict(self.SYMBOLS)
+            self._default_label = "?"
 
     def format(self, record) -> str:
-        label = self.SYMBOLS.get(record.levelno, "?")
+        label = self._labels.get(record.levelno, self._default_label)
         message = record.getMessage()
         prefix = ""
         if message.startswith("\r") and sys.stdout.isatty():
             prefix = "\r"
         message = message.lstrip("\r")
         if self.use_color:
-            color = self.COLORS.get(record.levelno, "")
-            label = color + label + self.RESET
-            positions = [message.find(c) for c in "(:" if c in message]
-            if not positions:
+            pos = min(
+                (p for p in (message.find("("), message.find(":")) if p != -1),
+                default=-1,
+            )
+            if pos == -1:
                 message = self.BOLD + message + self.RESET
             else:
-                pos = min(positions)
                 message = self.BOLD + message[:pos] + self.RESET + message[pos:]
         # record.msg = f"{prefix}{label} {message}"
         # return super().format(record)
@@ -138,11 +182,22 @@ class ProgressBar:
         self.verbose = verbose
         self.position = 0
         self.is_terminal = sys.stdout.isatty()
+        self._last_progress: int | None = None
+        self._last_time = 0.0
 
     def update(self, progress: int):
         if self.verbose or not self.is_terminal:
             return
 
+        # Redraw at most every 100ms, except for the first and last steps
+        if progress == self._last_progress:
+            return
+        now = time.monotonic()
+        if progress not in (0, self.width) and now - self._last_time < 0.1:
+            return
+        self._last_progress = progress
+        self._last_time = now
+
         spinner_char = self.__SPINNER[progress % len(self.__SPINNER)]
         dots = "." * self.width
         fill = self.fill * self.width
@@ -173,6 +228,12 @@ def setup_logger() -> logging.Logger:
 
 def run(cmd: list[str], verbose: bool = False, **kwargs):
     check = kwargs.pop("check", True)
+    # Let subprocess use posix_spawn() instead of fork()+exec() where it can:
+    # it needs an executable path with a folder, no cwd, and no
+    # preexec_fn/pass_fds/start_new_session (do not add those here), and
+    # close_fds=False before Python 3.13 (kept True, fds must not leak).
+    if os.name == "posix" and not os.path.dirname(cmd[0]):
+        cmd = [shutil.which(cmd[0]) or cmd[0], *cmd[1:]]
     if verbose or kwargs.get("capture_output"):
         return subprocess.run(cmd, check=check, text=True, **kwargs)
     else:
@@ -180,20 +241,58 @@ def run(cmd: list[str], verbose: bool = False, **kwargs):
             cmd,
             check=check,
             text=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
+            stdout=DEVNULL_FD,
+            stderr=DEVNULL_FD,
             **kwargs,
         )
 
 
-def download_with_etag(url: str) -> Path:
+@contextmanager
+def http_get(
+    url: str, headers: dict[str, str], chunk_size: int = 64 * 1024
+) -> Iterator[tuple[int, Mapping[str, str], Iterator[bytes]]]:
+    """
+    Yields status, headers and an iterator over body chunks.
+    A 304 is yielded (with an empty body) rather than raised.
+    """
+    if HTTP_CLIENT is not None:
+        with HTTP_CLIENT.stream("GET", url, headers=headers) as response:
+            if response.status_code != 304:
+                response.raise_for_status()
+            yield response.status_code, response.headers, response.iter_bytes(
+                chunk_size
+            )
+        return
+
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        response = urllib.request.urlopen(request)
+    except urllib.error.HTTPError as e:
+        if e.code != 304:
+            raise
+        yield e.code, e.headers, iter(())
+        return
+    with response:
+        yield response.status, response.headers, iter(
+            lambda: response.read(chunk_size), b""
+        )
+
+
+def write_json(path: Path, obj) -> None:
+    """Writes a JSON file (4-space indent) in a single write."""
+    path.write_text(json.dumps(obj, indent=4))
+
+
+def download_with_etag(url: str) -> tuple[Path, str | None]:
+    """Returns the cached file and its digest (None for an older cache entry)."""
     cache_dir = Path.home() / ".cache" / "eng209"
     cache_dir.mkdir(parents=True, exist_ok=True)
-    cache_path = cache_dir / hashlib.sha256(url.encode()).hexdigest()
+    cache_path = cache_dir / hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
     meta_path = cache_path.with_suffix(".meta.json")
 
     headers = {"User-Agent": "Client"}
-    if meta_path.exists():
+    meta = {}
+    if meta_path.exists() and cache_path.exists():
         with open(meta_path) as f:
             meta = json.load(f)
             if meta.get("ETag"):
@@ -201,38 +300,42 @@ def download_with_etag(url: str) -> Path:
             if meta.get("Last-Modified"):
                 headers["If-Modified-Since"] = meta["Last-Modified"]
 
-    request = urllib.request.Request(url, headers=headers)
-    try:
-        with urllib.request.urlopen(request) as response:
-            if response.status == 304:
-                logger.debug("Not modified, using cache.")
-                return cache_path
-
-            logger.debug(f"Downloading: {url}")
-            data = response.read()
-            with open(cache_path, "wb") as f:
-                f.write(data)
-
-            # Save headers for next time
-            response_meta = {
-                "Url": url,
-                "ETag": response.headers.get("ETag"),
-                "Last-Modified": response.headers.get("Last-Modified"),
-            }
-            with open(meta_path, "w") as f:
-                json.dump(response_meta, f)
-
-            return cache_path
-
-    except urllib.error.HTTPError as e:
-        if e.code == 304:
+    with http_get(url, headers) as (status, response_headers, chunks):
+        if status == 304:
             logger.debug("Not modified (304), using cache.")
-            return cache_path
-        else:
-            raise
+            return cache_path, meta.get("Digest")
+
+        # Stream to a temporary file, the cache only changes once complete
+        logger.debug(f"Downloading: {url}")
+        part_path = cache_path.with_suffix(".part")
+        h = hashlib.blake2b(digest_size=16)
+        with open(part_path, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                h.update(chunk)
+
+    digest = h.hexdigest()
+    if digest == meta.get("Digest"):
+        # 200 with unchanged content (e.g. no validators sent back)
+        logger.debug("Unchanged content, using cache.")
+        part_path.unlink()
+    else:
+        os.replace(part_path, cache_path)
+
+    # Save headers for next time
+    response_meta = {
+        "Url": url,
+        "ETag": response_headers.get("ETag"),
+        "Last-Modified": response_headers.get("Last-Modified"),
+        "Digest": digest,
+    }
+    with open(meta_path, "w") as f:
+        json.dump(response_meta, f)
 
+    return cache_path, digest
 
-def download_github_zip(url: str) -> Path:
+
+def download_github_zip(url: str) -> tuple[Path, str | None]:
     logger.info(f"Download archive: {url}")
     try:
         return download_with_etag(url)
@@ -246,9 +349,24 @@ def extract_archive(
     overwrite: bool = False,
     verbose: bool = False,
     force_overwrite: set[str] = {"update.py"},
+    digest: str | None = None,
 ):
     logger.info(f"Extract class materials: {extract_to}")
-    if extract_to.exists():
+    if digest is None:
+        with open(path, "rb") as f:
+            digest = hashlib.file_digest(
+                f, lambda: hashlib.blake2b(digest_size=16)
+            ).hexdigest()
+    state_path = extract_to / ".eng209-extract.json"
+    unchanged = False
+    if not overwrite and state_path.exists():
+        with open(state_path) as f:
+            unchanged = json.load(f).get("Digest") == digest
+
+    if unchanged:
+        # Only the force_overwrite files are restored
+        logger.info("Archive unchanged since last extraction (use --force)")
+    elif extract_to.exists():
         if overwrite:
             logger.warning(f"Overwrite existing files")
         else:
@@ -256,35 +374,81 @@ def extract_archive(
 
     with zipfile.ZipFile(str(path), "r") as zip_ref:
         members = zip_ref.infolist()
-        root_prefix = members[0].filename.split("/")[0] + "/"
-        progress = ProgressBar(width=10, fill="*", verbose=verbose)
-        progress.update(0)
-
-        for i, member in enumerate(members, 1):
-            if member.is_dir():
+    root_prefix = members[0].filename.split("/")[0] + "/"
+
+    # Resolve targets and create their folders up front, workers only write files
+    relpath, join, dirname = os.path.relpath, os.path.join, os.path.dirname
+    targets: list[tuple[zipfile.ZipInfo, str, str]] = []
+    for member in members:
+        if not member.is_dir():
+            member_relpath = relpath(member.filename, root_prefix)
+            if unchanged and member_relpath not in force_overwrite:
                 continue
+            targets.append((member, member_relpath, join(extract_to, member_relpath)))
+    for target_dir in {dirname(target_path) for _, _, target_path in targets}:
+        os.makedirs(target_dir, exist_ok=True)
+    # Files of a same folder are written one after the other
+    targets.sort(key=lambda target: (dirname(target[1]), target[1]))
+
+    # One ZipFile per worker thread, members are inflated in parallel
+    local = threading.local()
+    zip_refs: list[zipfile.ZipFile] = []
+    exists, islink = os.path.lexists, os.path.islink
+    umask = os.umask(0)
+    os.umask(umask)
+
+    def extract_member(member: zipfile.ZipInfo, member_relpath: str, target_path: str):
+        if overwrite or not exists(target_path) or member_relpath in force_overwrite:
+            if not hasattr(local, "zip_ref"):
+                local.zip_ref = zipfile.ZipFile(str(path), "r")
+                local.view = memoryview(bytearray(1024 * 1024))
+                zip_refs.append(local.zip_ref)
+            # Unix mode bits, as stored by git archive (0 for other archivers)
+            mode = member.external_attr >> 16
+            is_symlink = stat.S_ISLNK(mode) and os.name == "posix"
+            if islink(target_path) or (is_symlink and exists(target_path)):
+                os.unlink(target_path)
+            if is_symlink:
+                os.symlink(local.zip_ref.read(member).decode(), target_path)
+                return
+            view = local.view
+            fd = os.open(target_path, WRITE_FLAGS, 0o644)
+            try:
+                with local.zip_ref.open(member) as src:
+                    while n := src.readinto(view):
+                        written = 0
+                        while written < n:
+                            written += os.write(fd, view[written:n])
+            finally:
+                os.close(fd)
+            if stat.S_IMODE(mode):
+                os.chmod(target_path, stat.S_IMODE(mode) & ~umask)
+        else:
+            logger.debug(f"Skipped existing file: {target_path}")
 
-            member_relpath = os.path.relpath(member.filename, root_prefix)
-            target_path = os.path.join(extract_to, member_relpath)
-
-            if (
-                overwrite
-                or not os.path.exists(target_path)
-                or member_relpath in force_overwrite
-            ):
-                os.makedirs(os.path.dirname(target_path), exist_ok=True)
-                with open(target_path, "wb") as f:
-                    f.write(zip_ref.read(member))
-            else:
-                logger.debug(f"Skipped existing file: {target_path}")
+    progress = ProgressBar(width=10, fill="*", verbose=verbose)
+    progress.update(0)
+    # Redraw the 10-step bar only when it can actually advance
+    progress_stride = max(1, len(targets) // 10)
+    try:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = [executor.submit(extract_member, *target) for target in targets]
+            for i, future in enumerate(as_completed(futures), 1):
+                future.result()
+                if i % progress_stride == 0:
+                    progress.update(min(10, i // progress_stride))
+    finally:
+        for zip_ref in zip_refs:
+            zip_ref.close()
 
-            progress.update(int(10.0 / len(members) * i))
+    progress.finish()
 
-        progress.finish()
+    with open(state_path, "w") as f:
+        json.dump({"Archive": str(path), "Digest": digest}, f)
 
 
 def git_clone_with_retries(
-    url: str, dest: Path, timeout: int = 15, verbose: bool = False, deep: bool = False
+    url: str, dest: Path, timeout: int = 15, verbose: bool = False
 ):
     logger.info(f"Cloning project: {url}")
     progress = ProgressBar(width=timeout, fill="X", verbose=verbose)
@@ -292,13 +456,7 @@ def git_clone_with_retries(
     i = 0
     while time.time() - start < timeout:
         try:
-            if deep:
-                run(["git", "clone", url, str(dest)], verbose=verbose)
-            else:
-                run(
-                    ["git", "clone", "--depth", "1", "--single-branch", url, str(dest)],
-                    verbose=verbose,
-                )
+            run(["git", "clone", url, str(dest)], verbose=verbose)
             return
         except subprocess.CalledProcessError:
             i += 1
@@ -309,6 +467,52 @@ def git_clone_with_retries(
         raise RuntimeError(f"Failed to clone {url}")
 
 
+def git_init_from_archive(
+    url: str, dest: Path, branch: str = "main", verbose: bool = False
+):
+    """
+    Turns a folder extracted from the branch archive into a git working tree.
+    Only the tip commit and its trees are fetched, the file contents already
+    come from the archive (blobs are fetched on demand).
+    """
+    logger.info(f"Initializing git repository: {url}")
+    run(["git", "init", "-q", str(dest)], verbose=verbose)
+    git = ["git", "-C", str(dest)]  # rather than cwd=, see run()
+    run(git + ["symbolic-ref", "HEAD", f"refs/heads/{branch}"], verbose=verbose)
+    # track only the branch, later fetches would otherwise get every branch
+    run(git + ["remote", "add", "-t", branch, "origin", url], verbose=verbose)
+    run(
+        git + ["fetch", "--depth", "1", "--filter=blob:none", "origin", branch],
+        verbose=verbose,
+    )
+    with open(dest / ".git" / "info" / "exclude", "a") as f:
+        f.write(".eng209-extract.json\n")
+    run(git + ["reset", "-q", f"origin/{branch}"], verbose=verbose)
+
+    # The archive may not match origin exactly (file modes lost by the archiver,
+    # or a commit pushed between the download and the fetch): origin wins.
+    status = run(git + ["status", "--porcelain", "-z"], capture_output=True).stdout
+    status = status.split("\0")
+    changed = [entry[3:] for entry in status if entry and not entry.startswith("??")]
+    untracked = [entry[3:] for entry in status if entry.startswith("??")]
+    if changed:
+        logger.debug(f"Restoring {len(changed)} file(s) from origin/{branch}")
+        try:
+            run(git + ["checkout", "-q", "--"] + changed, verbose=verbose)
+        except subprocess.CalledProcessError:
+            run(git + ["reset", "-q", "--hard", f"origin/{branch}"], verbose=verbose)
+    if untracked:
+        logger.debug(f"Removing {len(untracked)} file(s) not in origin/{branch}")
+        run(git + ["clean", "-q", "-f", "-d", "--"] + untracked, verbose=verbose)
+
+
+def git_current_branch(project_path: Path) -> str:
+    """Reads the checked out branch from .git/HEAD ('HEAD' when detached)."""
+    head = (project_path / ".git" / "HEAD").read_text().strip()
+    prefix = "ref: refs/heads/"
+    return head[len(prefix) :] if head.startswith(prefix) else "HEAD"
+
+
 def verify_python(required_version_str: str):
     required_major, required_minor = map(int, required_version_str.split(".")[:2])
     current_major, current_minor = sys.version_info[:2]
@@ -358,12 +562,31 @@ def install_packages(venv_path: Path, verbose: bool = False):
     logger.info(f"Installing Python packages to venv")
     progress = ProgressBar(width=len(PACKAGES), fill="*", verbose=verbose)
     progress.update(0)
-    for i, pkg in enumerate(PACKAGES, 1):
-        run(
-            [str(pip_path), "install", "--require-virtualenv", "--no-input", pkg],
-            verbose=verbose,
-        )
-        progress.update(i)
+    pip_install = [str(pip_path), "install", "--require-virtualenv", "--no-input"]
+    try:
+        # Single pip run so that the resolver plans all packages at once,
+        # progress advances on each requirement pip reports.
+        cmd = pip_install + ["--progress-bar", "off", *PACKAGES]
+        with subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=None if verbose else DEVNULL_FD,
+            text=True,
+        ) as process:
+            i = 0
+            for line in process.stdout:
+                if verbose:
+                    print(line, end="", flush=True)
+                if line.startswith(("Collecting ", "Requirement already satisfied")):
+                    i += 1
+                    progress.update(min(i, len(PACKAGES)))
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, cmd)
+    except subprocess.CalledProcessError:
+        logger.debug("Batch install failed, installing packages one at a time")
+        for i, pkg in enumerate(PACKAGES, 1):
+            run(pip_install + [pkg], verbose=verbose)
+            progress.update(i)
     # -- Give a custom display name to the python jupyter kernel
     # python_path = venv_bin / "python3.12"
     # run([str(python_path),
@@ -377,15 +600,16 @@ def install_packages(venv_path: Path, verbose: bool = False):
 
 def setup_vscode(project_path: Path, venv_path: Path):
     logger.info(f"Configuring VS Code for project")
-    for workspace_file in glob.glob("*.code-workspace"):
-        os.remove(workspace_file)
+    with os.scandir(".") as entries:
+        for entry in entries:
+            if entry.name.endswith(".code-workspace") and entry.is_file():
+                os.unlink(entry.path)
     vscode_dir = project_path / ".vscode"
     vscode_dir.mkdir(parents=True, exist_ok=True)
-    venv_subpath = (
-        venv_path.relative_to(project_path)
-        if venv_path.is_relative_to(project_path)
-        else venv_path
-    )
+    try:
+        venv_subpath = venv_path.relative_to(project_path)
+    except ValueError:
+        venv_subpath = venv_path
     venv_bin = venv_subpath / ("Scripts" if os.name == "nt" else "bin")
 
     settings = {
@@ -422,42 +646,14 @@ def setup_vscode(project_path: Path, venv_path: Path):
         "mypy.mypyExecutable": str(Path("${workspaceFolder}") / venv_bin / "mypy"),
         "mypy.dmypyExecutable": str(Path("${workspaceFolder}") / venv_bin / "dmypy"),
         # -- Hide thes files in file explorer
-        "files.exclude": {
-            "**/.env": True,
-            "**/.git": True,
-            "**/.DS_Store": True,
-            "**/venv": True,
-            "**/.mypy_cache": True,
-            "**/.ipynb_checkpoints": True,
-            "**/.__pycache__": True,
-            "**/*.pyc": True,
-        },
+        "files.exclude": VSCODE_EXCLUDES,
         # -- Ignore changes in these files
-        "files.watcherExclude": {
-            "**/.env": True,
-            "**/.git": True,
-            "**/.DS_Store": True,
-            "**/venv": True,
-            "**/.mypy_cache": True,
-            "**/.ipynb_checkpoints": True,
-            "**/.__pycache__": True,
-            "**/*.pyc": True,
-        },
+        "files.watcherExclude": VSCODE_EXCLUDES,
         # -- Do not include these files in search
-        "search.exclude": {
-            "**/.env": True,
-            "**/.git": True,
-            "**/.DS_Store": True,
-            "**/venv": True,
-            "**/.mypy_cache": True,
-            "**/.ipynb_checkpoints": True,
-            "**/.__pycache__": True,
-            "**/*.pyc": True,
-        },
+        "search.exclude": VSCODE_EXCLUDES,
     }
 
-    with open(vscode_dir / "settings.json", "w") as f:
-        json.dump(settings, f, indent=4)
+    write_json(vscode_dir / "settings.json", settings)
 
     command = venv_bin / ("bpython.exe" if os.name == "nt" else "bpython")
 
@@ -479,8 +675,7 @@ def setup_vscode(project_path: Path, venv_path: Path):
         ],
     }
 
-    with open(vscode_dir / "tasks.json", "w") as f:
-        json.dump(tasks, f, indent=4)
+    write_json(vscode_dir / "tasks.json", tasks)
 
 
 def setup_vscode_global(code_user_path: Path):
@@ -503,8 +698,7 @@ def setup_vscode_global(code_user_path: Path):
             "args": "jupyter",
         },
     ]
-    with open(keybindings_path, "w") as f:
-        json.dump(keybindings, f, indent=4)
+    write_json(keybindings_path, keybindings)
 
 
 def manage_vscode_extensions(verbose: bool = False):
@@ -514,29 +708,48 @@ def manage_vscode_extensions(verbose: bool = False):
         fill="*",
         verbose=verbose,
     )
-    i = 0
-    fail_install = []
-    progress.update(i)
-    for ext in VSCODE_EXTENSIONS["install"]:
-        try:
-            if "@" in ext:
-                run(["code", "--install-extension", ext], verbose=verbose)
-            else:
-                run(["code", "--install-extension", ext, "--force"], verbose=verbose)
-            time.sleep(0.5)
-        except subprocess.CalledProcessError:
-            fail_install += [ext]
-        i += 1
-        progress.update(i)
-    fail_uninstall = []
-    for ext in VSCODE_EXTENSIONS["uninstall"]:
-        try:
-            run(["code", "--uninstall-extension", ext], verbose=verbose)
-            time.sleep(0.5)
-        except subprocess.CalledProcessError:
-            fail_uninstall += [ext]
-        i += 1
-        progress.update(i)
+
+    def manage(
+        option: str, extensions: list[str], extra: tuple[str, ...] = ()
+    ) -> list[str]:
+        """Runs one 'code' call for all extensions, returns the ones that failed."""
+        if not extensions:
+            return []
+        cmd = ["code", *(arg for ext in extensions for arg in (option, ext)), *extra]
+        if run(cmd, verbose=verbose, check=False).returncode == 0:
+            return []
+        # One call per extension, only to find out which one failed
+        failed = []
+        for ext in extensions:
+            cmd = ["code", option, ext, *extra]
+            if run(cmd, verbose=verbose, check=False).returncode != 0:
+                failed.append(ext)
+        return failed
+
+    # Each 'code' process rewrites the shared extensions.json, so calls are not
+    # run concurrently: pinned versions, then unpinned ones (--force to update).
+    # Installed extensions are listed once (ids are case-insensitive): pinned
+    # versions already present and extensions not installed are left alone.
+    listing = run(
+        ["code", "--list-extensions", "--show-versions"],
+        capture_output=True,
+        check=False,
+    )
+    installed = {line.strip().lower() for line in listing.stdout.splitlines()}
+    installed_ids = {ext.split("@")[0] for ext in installed}
+    install = VSCODE_EXTENSIONS["install"]
+    pinned = [ext for ext in install if "@" in ext and ext.lower() not in installed]
+    unpinned = [ext for ext in install if "@" not in ext]
+    uninstall = [
+        ext for ext in VSCODE_EXTENSIONS["uninstall"] if ext.lower() in installed_ids
+    ]
+    progress.update(0)
+    fail_install = manage("--install-extension", pinned)
+    progress.update(len(install) - len(unpinned))
+    fail_install += manage("--install-extension", unpinned, ("--force",))
+    progress.update(len(install))
+    fail_uninstall = manage("--uninstall-extension", uninstall)
+    progress.update(len(install) + len(VSCODE_EXTENSIONS["uninstall"]))
     progress.finish()
     for ext in fail_install:
         logger.warning(f"Could not install VS Code extension '{ext}'")
@@ -558,7 +771,7 @@ def main():
     parser.add_argument(
         "--clone",
         action="store_true",
-        help="Shallow clone (main branch). Default is to copy from github archive.",
+        help="Shallow git working tree (main branch, built from the github archive). Default is a plain copy of the archive.",
     )
     parser.add_argument(
         "--deep-clone",
@@ -598,12 +811,25 @@ def main():
                 raise RuntimeError(
                     f"cannot clone ({course_path} exists and is not a git repository)"
                 )
-            git_clone_with_retries(
-                GITHUB_PROJECT + ".git",
-                course_path,
-                verbose=args.verbose,
-                deep=args.deep_clone,
-            )
+            if args.deep_clone:
+                git_clone_with_retries(
+                    GITHUB_PROJECT + ".git",
+                    course_path,
+                    verbose=args.verbose,
+                )
+            else:
+                archive_file, digest = download_github_zip(CODE_ARCHIVE)
+                try:
+                    extract_archive(
+                        archive_file, course_path, verbose=args.verbose, digest=digest
+                    )
+                    git_init_from_archive(
+                        GITHUB_PROJECT + ".git", course_path, verbose=args.verbose
+                    )
+                except:
+                    # course_path did not exist, leave no half initialized repository
+                    shutil.rmtree(course_path, ignore_errors=True)
+                    raise
         else:
             logger.info(f"Using existing project: {course_path}")
 
@@ -618,19 +844,18 @@ def main():
                     ["git", "stash", "push", "-m", "autostash before update"],
                     verbose=args.verbose,
                 )
-                # 2. Fetch tags (!moved tags are not updated)
-                run(["git", "fetch", "--tags"], verbose=args.verbose)
-                # 3. Fetch latest from origin
-                run(["git", "fetch", "origin"], verbose=args.verbose)
-                # 4. Reset current branch to match remote (remote wins)
-                current_branch = run(
-                    ["git", "rev-parse", "--abbrev-ref", "HEAD"], capture_output=True
-                ).stdout.strip()
+                # 2. Fetch latest branches and tags (!moved tags are not updated)
+                run(
+                    ["git", "fetch", "--tags", "--prune", "origin"],
+                    verbose=args.verbose,
+                )
+                # 3. Reset current branch to match remote (remote wins)
+                current_branch = git_current_branch(course_path)
                 run(
                     ["git", "reset", "--hard", f"origin/{current_branch}"],
                     verbose=args.verbose,
                 )
-                # 5. Apply stashed changes if possible
+                # 4. Apply stashed changes if possible
                 stash_result = run(
                     ["git", "stash", "pop"],
                     verbose=args.verbose,
@@ -652,9 +877,13 @@ def main():
         else:
             logger.warning("Git command not found, cannot update existing git project")
     else:
-        archive_file = download_github_zip(CODE_ARCHIVE)
+        archive_file, digest = download_github_zip(CODE_ARCHIVE)
         extract_archive(
-            archive_file, course_path, overwrite=args.force, verbose=args.verbose
+            archive_file,
+            course_path,
+            overwrite=args.force,
+            verbose=args.verbose,
+            digest=digest,
         )
         os.chdir(course_path)
 